@@ -13,19 +13,50 @@ import calendar
 import csv
 import datetime as dt
 import math
+from collections import deque
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence
+from typing import TYPE_CHECKING, Iterable, List, NamedTuple, Optional, Sequence, Union
 
+if TYPE_CHECKING:
+    import numpy as np
 
-@dataclass
-class SeriesPoint:
+# Below this length the NumPy call overhead outweighs the vectorised pass.
+NUMPY_MIN_LENGTH = 256
+# Importing Numba and loading its cached kernel costs ~0.35 s once per process.
+# The first series this long pays it (each call then saves ~40 ns per value);
+# after that the kernel is used for every call.
+NUMBA_MIN_LENGTH = 1_000_000
+# 1 MiB reads keep syscall counts low on large CSV files.
+READ_BUFFER_SIZE = 1 << 20
+
+
+class SeriesPoint(NamedTuple):
     """Represents a single observation in the time series."""
 
     date: dt.date
     value: float
 
 
+@dataclass(eq=False)
+class SeriesFrame:
+    """Column-oriented time series: parallel sequences of dates and values.
+
+    The CLI stores lists and the dashboard NumPy arrays, whose ``==`` is
+    elementwise, so frames compare by identity.
+    """
+
+    dates: Union[Sequence[dt.date], np.ndarray]
+    values: Union[Sequence[float], np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def points(self) -> List[SeriesPoint]:
+        return [SeriesPoint(date=date, value=value) for date, value in zip(self.dates, self.values)]
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Moving-average forecasting demo that works with a demo dataset or a CSV."
@@ -56,86 +87,219 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def load_series_from_csv(path: Path) -> List[SeriesPoint]:
+def load_series_from_csv(path: Path) -> SeriesFrame:
     if not path.exists():
         raise FileNotFoundError(f"Could not find data file: {path}")
 
-    points: List[SeriesPoint] = []
-    with path.open("r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if not row.get("date") or not row.get("value"):
-                continue
-            points.append(
-                SeriesPoint(
-                    date=dt.date.fromisoformat(row["date"].strip()),
-                    value=float(row["value"].strip()),
-                )
-            )
-
-    points.sort(key=lambda p: p.date)
-    if not points:
+    raw_dates: List[str] = []
+    raw_values: List[str] = []
+    with path.open("r", encoding="utf-8-sig", newline="", buffering=READ_BUFFER_SIZE) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if "date" in header and "value" in header:
+            date_idx = header.index("date")
+            value_idx = header.index("value")
+            min_width = max(date_idx, value_idx) + 1
+            for row in reader:
+                if len(row) < min_width or not row[date_idx] or not row[value_idx]:
+                    continue
+                raw_dates.append(row[date_idx])
+                raw_values.append(row[value_idx])
+
+    # Convert whole columns at once so the per-value calls run inside map().
+    dates = list(map(dt.date.fromisoformat, map(str.strip, raw_dates)))
+    values = list(map(float, raw_values))
+    if not values:
         raise ValueError("No valid rows were found in the CSV file.")
-    return points
+    order = sorted(range(len(dates)), key=dates.__getitem__)
+    return SeriesFrame(dates=[dates[i] for i in order], values=[values[i] for i in order])
 
 
-def generate_demo_series(length: int = 36) -> List[SeriesPoint]:
+def generate_demo_series(length: int = 36) -> SeriesFrame:
     start = dt.date(2021, 1, 1)
-    series: List[SeriesPoint] = []
+    dates: List[dt.date] = []
+    values: List[float] = []
     for i in range(length):
-        date = add_months(start, i)
         seasonal = 12 * math.sin((2 * math.pi * i) / 12)
         trend = 0.9 * i
         cyclical = ((i % 5) - 2) * 1.8
-        value = 120 + trend + seasonal + cyclical
-        series.append(SeriesPoint(date=date, value=round(value, 2)))
-    return series
+        dates.append(add_months(start, i))
+        values.append(round(120 + trend + seasonal + cyclical, 2))
+    return SeriesFrame(dates=dates, values=values)
 
 
 def moving_average(values: Sequence[float], window: int) -> List[Optional[float]]:
     if window <= 0:
         raise ValueError("Window must be a positive integer.")
-    results: List[Optional[float]] = []
-    for idx in range(len(values)):
-        start = max(0, idx - window + 1)
-        window_slice = values[start : idx + 1]
-        if len(window_slice) < window:
-            results.append(None)
+    if len(values) >= NUMPY_MIN_LENGTH and _load_numpy() is not None:
+        return _moving_average_np(values, window)
+    return _moving_average_py(values, window)
+
+
+def moving_average_array(values: Sequence[float], window: int) -> "np.ndarray":
+    """Return the moving average as a float64 array, NaN during the burn-in."""
+    np = _load_numpy()
+    if np is None:
+        raise RuntimeError("moving_average_array requires NumPy.")
+    if window <= 0:
+        raise ValueError("Window must be a positive integer.")
+    if len(values) >= NUMBA_MIN_LENGTH or _load_fast_kernel.cache_info().currsize:
+        fast_kernel = _load_fast_kernel()
+        if fast_kernel is not None:
+            return fast_kernel(values, window)
+    arr = np.asarray(values, dtype=np.float64)
+    smoothed = np.full(arr.shape, np.nan)
+    if arr.size < window:
+        return smoothed
+    finite = np.isfinite(arr)
+    clean = np.where(finite, arr, 0.0)
+    # Prefix sums alone lose precision as the running total grows, so carry
+    # the exact rounding error of every step in a second prefix sum and add
+    # it back when differencing, as the scalar loop's compensation term does.
+    totals = np.zeros(arr.size + 1)
+    np.cumsum(clean, out=totals[1:])
+    errors = np.zeros(arr.size + 1)
+    errors[1:] = _two_sum_error(totals[:-1], clean, totals[1:])
+    np.cumsum(errors[1:], out=errors[1:])
+    lead, trail = totals[window:], totals[:-window]
+    sums = lead - trail
+    sums += (errors[window:] - errors[:-window]) + _two_sum_error(lead, -trail, sums)
+    if not finite.all():
+        # Windows holding inf/nan are summed directly, like the scalar loop.
+        counts = np.zeros(arr.size + 1, dtype=np.intp)
+        np.cumsum(~finite, out=counts[1:])
+        hit = np.flatnonzero(counts[window:] - counts[:-window])
+        with np.errstate(invalid="ignore"):
+            sums[hit] = np.lib.stride_tricks.sliding_window_view(arr, window)[hit].sum(axis=-1)
+    smoothed[window - 1 :] = sums / window
+    return smoothed
+
+
+@lru_cache(maxsize=None)
+def _load_numpy():
+    """Import NumPy on first use, or return None if it is not installed.
+
+    NumPy is optional: the CLI stays zero-dependency and only pays the import
+    cost for series long enough to use the vectorised paths.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+@lru_cache(maxsize=None)
+def _load_fast_kernel():
+    """Return the Numba kernel from moving_average_fast, or None if unavailable."""
+    try:
+        if __package__:
+            from .moving_average_fast import moving_average_float64
+        else:
+            from moving_average_fast import moving_average_float64
+    except ImportError:
+        return None
+    return moving_average_float64
+
+
+def _moving_average_np(values: Sequence[float], window: int) -> List[Optional[float]]:
+    smoothed = moving_average_array(values, window)
+    burn_in = min(window - 1, len(smoothed))
+    return [None] * burn_in + smoothed[burn_in:].tolist()
+
+
+def _moving_average_py(values: Sequence[float], window: int) -> List[Optional[float]]:
+    results: List[Optional[float]] = [None] * len(values)
+    running = 0.0
+    compensation = 0.0
+    # inf/nan stay out of the running sum; windows holding one are summed
+    # directly so the series recovers once the value leaves the window.
+    non_finite = 0
+    for idx, value in enumerate(values):
+        if math.isfinite(value):
+            running, compensation = _compensated_add(running, compensation, value)
         else:
-            results.append(sum(window_slice) / window)
+            non_finite += 1
+        if idx >= window:
+            oldest = values[idx - window]
+            if math.isfinite(oldest):
+                running, compensation = _compensated_add(running, compensation, -oldest)
+            else:
+                non_finite -= 1
+        if idx >= window - 1:
+            if non_finite:
+                results[idx] = sum(values[idx - window + 1 : idx + 1]) / window
+            else:
+                results[idx] = (running + compensation) / window
     return results
 
 
+def _compensated_add(running: float, compensation: float, value: float):
+    """One Neumaier step: add ``value`` and carry the rounding error.
+
+    Neumaier's variant of Kahan summation keeps running window sums from
+    drifting as values enter and leave over a long series.
+    """
+    total = running + value
+    if abs(running) >= abs(value):
+        compensation += (running - total) + value
+    else:
+        compensation += (value - total) + running
+    return total, compensation
+
+
+def _two_sum_error(a: "np.ndarray", b: "np.ndarray", total: "np.ndarray") -> "np.ndarray":
+    """Exact rounding error of ``total = a + b``, elementwise (Knuth's TwoSum)."""
+    virtual = total - a
+    return (a - (total - virtual)) + (b - virtual)
+
+
 def forecast(values: Sequence[float], window: int, horizon: int) -> List[float]:
+    if window <= 0:
+        raise ValueError("Window must be a positive integer.")
     if horizon <= 0:
         return []
-    history = list(values)
+    recent = deque(values[-window:], maxlen=window)
+    if not all(map(math.isfinite, recent)):
+        # Once the window holds inf or nan, every later prediction does too.
+        return [sum(recent) / len(recent)] * horizon
+    running = math.fsum(recent)
+    compensation = 0.0
     forecasts: List[float] = []
     for _ in range(horizon):
-        window_slice = history[-window:]
-        forecasts.append(sum(window_slice) / len(window_slice))
-        history.append(forecasts[-1])
+        prediction = (running + compensation) / len(recent)
+        forecasts.append(prediction)
+        if len(recent) == window:
+            running, compensation = _compensated_add(running, compensation, -recent[0])
+        running, compensation = _compensated_add(running, compensation, prediction)
+        recent.append(prediction)
     return forecasts
 
 
 def add_months(date: dt.date, months: int) -> dt.date:
+    return dt.date.fromordinal(_add_months_ordinal(date.toordinal(), months))
+
+
+@lru_cache(maxsize=4096)
+def _add_months_ordinal(ordinal: int, months: int) -> int:
+    date = dt.date.fromordinal(ordinal)
     year = date.year + (date.month - 1 + months) // 12
     month = (date.month - 1 + months) % 12 + 1
     day = min(date.day, calendar.monthrange(year, month)[1])
-    return dt.date(year, month, day)
+    return dt.date(year, month, day).toordinal()
 
 
-def select_history(points: Sequence[SeriesPoint], lookback: int) -> Sequence[SeriesPoint]:
+def select_history(series: SeriesFrame, lookback: int) -> SeriesFrame:
     if lookback <= 0:
-        return []
-    return points[-lookback:]
+        return SeriesFrame(dates=series.dates[:0], values=series.values[:0])
+    return SeriesFrame(dates=series.dates[-lookback:], values=series.values[-lookback:])
 
 
-def print_history_table(points: Sequence[SeriesPoint], smoothed: Sequence[Optional[float]]):
+def print_history_table(history: SeriesFrame, smoothed: Sequence[Optional[float]]):
     print("\nRecent history")
     print("Date        Actual    MA")
     print("----------------------------")
-    for point, ma in zip(points, smoothed[-len(points) :]):
+    for point, ma in zip(history.points(), smoothed[-len(history) :]):
         ma_display = f"{ma:8.2f}" if ma is not None else "    --  "
         print(f"{point.date.isoformat()}  {point.value:7.2f}  {ma_display}")
 
@@ -149,22 +313,55 @@ def print_forecast_table(dates: Sequence[dt.date], values: Sequence[float]):
 
 
 SPARK_CHARS = " .:-=+*#%@"
+# inf/nan have no place on the scale and are drawn with this instead.
+SPARK_MISSING = "?"
+SPARK_MISSING_INDEX = 255
+# Maps a quantised index byte straight to its character for bytes.translate.
+SPARK_TABLE = bytes(
+    ord(SPARK_MISSING if i == SPARK_MISSING_INDEX else SPARK_CHARS[min(i, len(SPARK_CHARS) - 1)]) for i in range(256)
+)
 
 
 def sparkline(values: Sequence[float]) -> str:
     if not values:
         return ""
-    v_min = min(values)
-    v_max = max(values)
+    if len(values) >= NUMPY_MIN_LENGTH and _load_numpy() is not None:
+        return _sparkline_np(values)
+    v_min = math.inf
+    v_max = -math.inf
+    for value in values:
+        if math.isfinite(value):
+            if value < v_min:
+                v_min = value
+            if value > v_max:
+                v_max = value
+    if v_min > v_max:
+        return SPARK_MISSING * len(values)
     if v_min == v_max:
-        return "=" * len(values)
+        return "".join("=" if math.isfinite(value) else SPARK_MISSING for value in values)
     span = v_max - v_min
     scale = len(SPARK_CHARS) - 1
-    chars = []
-    for value in values:
-        normalized = int(round(((value - v_min) / span) * scale))
-        chars.append(SPARK_CHARS[normalized])
-    return "".join(chars)
+    indices = bytearray(
+        round(((value - v_min) / span) * scale) if math.isfinite(value) else SPARK_MISSING_INDEX
+        for value in values
+    )
+    return indices.translate(SPARK_TABLE).decode("ascii")
+
+
+def _sparkline_np(values: Sequence[float]) -> str:
+    np = _load_numpy()
+    arr = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(arr)
+    if not finite.any():
+        return SPARK_MISSING * arr.size
+    v_min = arr.min(where=finite, initial=np.inf)
+    v_max = arr.max(where=finite, initial=-np.inf)
+    if v_min == v_max:
+        return "".join("=" if ok else SPARK_MISSING for ok in finite.tolist())
+    scale = len(SPARK_CHARS) - 1
+    indices = np.full(arr.size, SPARK_MISSING_INDEX, dtype=np.uint8)
+    indices[finite] = np.rint(((arr[finite] - v_min) / (v_max - v_min)) * scale)
+    return indices.tobytes().translate(SPARK_TABLE).decode("ascii")
 
 
 def print_ascii_chart(actuals: Sequence[float], forecasts: Sequence[float]):
@@ -186,16 +383,16 @@ def main():
     else:
         series = generate_demo_series()
 
-    values = [point.value for point in series]
+    values = series.values
     smoothed = moving_average(values, args.window)
     forecasts = forecast(values, args.window, args.horizon)
-    future_dates = [add_months(series[-1].date, i + 1) for i in range(args.horizon)]
+    future_dates = [add_months(series.dates[-1], i + 1) for i in range(args.horizon)]
 
-    history_points = select_history(series, args.history)
+    history = select_history(series, args.history)
     print("Moving-average forecasting demo")
     print(f"Window size: {args.window}")
     print(f"Forecast horizon: {args.horizon}")
-    print_history_table(history_points, smoothed)
+    print_history_table(history, smoothed)
     print_forecast_table(future_dates, forecasts)
     print_ascii_chart(values, forecasts)
 
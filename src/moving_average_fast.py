@@ -0,0 +1,61 @@
+"""Numba-compiled moving-average kernel.
+
+Optional fast path for long series. Importing this module requires NumPy and
+Numba; ``moving_average_demo`` imports it lazily and falls back to the NumPy
+or pure-Python implementations when either is missing.
+"""
+from __future__ import annotations
+
+import numpy as np
+from numba import guvectorize, njit
+
+
+@njit(inline="always", cache=True)
+def _compensated_add(running, compensation, value):
+    """One Neumaier step, mirroring moving_average_demo._compensated_add."""
+    total = running + value
+    if abs(running) >= abs(value):
+        compensation += (running - total) + value
+    else:
+        compensation += (value - total) + running
+    return total, compensation
+
+
+@guvectorize(["void(float64[:], intp[:], float64[:])"], "(n),()->(n)", nopython=True, cache=True)
+def move_mean(values, window_arr, out):
+    """Trailing mean of ``values``; the burn-in holds the expanding mean.
+
+    Non-finite values stay out of the running sum; windows holding one are
+    summed directly so the output recovers once the value leaves the window.
+    """
+    window = window_arr[0]
+    running = 0.0
+    compensation = 0.0
+    non_finite = 0
+    for i in range(len(values)):
+        if np.isfinite(values[i]):
+            running, compensation = _compensated_add(running, compensation, values[i])
+        else:
+            non_finite += 1
+        if i >= window:
+            if np.isfinite(values[i - window]):
+                running, compensation = _compensated_add(running, compensation, -values[i - window])
+            else:
+                non_finite -= 1
+        count = min(i + 1, window)
+        if non_finite:
+            total = 0.0
+            for j in range(i + 1 - count, i + 1):
+                total += values[j]
+            out[i] = total / count
+        else:
+            out[i] = (running + compensation) / count
+
+
+def moving_average_float64(values: np.ndarray, window: int) -> np.ndarray:
+    """Return the moving average as a float64 array, NaN during the burn-in."""
+    if window <= 0:
+        raise ValueError("Window must be a positive integer.")
+    smoothed = move_mean(np.ascontiguousarray(values, dtype=np.float64), window)
+    smoothed[: window - 1] = np.nan
+    return smoothed
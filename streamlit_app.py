@@ -1,83 +1,163 @@
 """Streamlit UI for the moving-average forecasting demo."""
 from __future__ import annotations
 
-import csv
 import datetime as dt
+import hashlib
 import io
 from pathlib import Path
-from typing import List, Optional, Sequence
+from typing import List, Sequence
 
 import altair as alt
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 from src.moving_average_demo import (
-    SeriesPoint,
-    add_months,
+    SeriesFrame,
     forecast,
     generate_demo_series,
-    load_series_from_csv,
-    moving_average,
+    moving_average_array,
 )
 
 DATA_DIR = Path(__file__).resolve().parent / "data"
 SAMPLE_CSV = DATA_DIR / "monthly_demand.csv"
+# Rows per batch when streaming the combined series into the download buffer.
+CSV_CHUNK_ROWS = 10_000
+# Array-backed dates arrive as timestamps; keep the tables showing plain dates.
+DATE_COLUMNS = {
+    "Date": st.column_config.DateColumn(format="YYYY-MM-DD"),
+}
 
 
-def parse_uploaded_csv(buffer: object) -> List[SeriesPoint]:
-    """Convert uploaded bytes into the SeriesPoint structure."""
+def as_array_frame(series: SeriesFrame) -> SeriesFrame:
+    """Back a SeriesFrame with datetime64[D] and float64 NumPy columns."""
+
+    return SeriesFrame(
+        dates=np.array(series.dates, dtype="datetime64[D]"),
+        values=np.fromiter(series.values, dtype=np.float64, count=len(series.values)),
+    )
 
-    if hasattr(buffer, "getvalue"):
-        raw_bytes = buffer.getvalue()
-    elif isinstance(buffer, (bytes, bytearray)):
-        raw_bytes = buffer
-    else:
-        raise ValueError("Unsupported upload payload; expected bytes-like object.")
 
-    text = raw_bytes.decode("utf-8")
-    reader = csv.DictReader(io.StringIO(text))
-    points: List[SeriesPoint] = []
-    for row in reader:
-        if not row.get("date") or not row.get("value"):
-            continue
-        points.append(
-            SeriesPoint(
-                date=dt.date.fromisoformat(row["date"].strip()),
-                value=float(row["value"].strip()),
-            )
+def read_series_csv(source: object) -> SeriesFrame:
+    """Parse a date,value CSV (path or file-like) into an array-backed SeriesFrame.
+
+    Follows the CLI's ``load_series_from_csv`` rules: exact ``date``/``value``
+    headers, rows with an empty date or value skipped, dates parsed with
+    ``dt.date.fromisoformat`` and values with ``float()``. The frame is empty
+    when no row qualifies.
+    """
+
+    try:
+        frame = pd.read_csv(
+            source,
+            usecols=lambda column: column in ("date", "value"),
+            dtype=str,
+            na_filter=False,
+            encoding="utf-8-sig",
         )
+    except pd.errors.EmptyDataError:
+        frame = pd.DataFrame()
+    if "date" not in frame or "value" not in frame:
+        return SeriesFrame(dates=np.array([], dtype="datetime64[D]"), values=np.array([], dtype=np.float64))
+
+    frame = frame.fillna("")
+    frame = frame[(frame["date"] != "") & (frame["value"] != "")]
+    dates = np.array(list(map(dt.date.fromisoformat, frame["date"].str.strip())), dtype="datetime64[D]")
+    values = frame["value"].to_numpy().astype(np.float64)
+    order = np.argsort(dates, kind="stable")
+    return SeriesFrame(dates=dates[order], values=values[order])
+
 
-    points.sort(key=lambda p: p.date)
-    if not points:
+def parse_uploaded_csv(buffer: object) -> SeriesFrame:
+    """Convert an uploaded file (or raw bytes) into an array-backed SeriesFrame."""
+
+    if isinstance(buffer, (bytes, bytearray)):
+        buffer = io.BytesIO(buffer)
+    elif not hasattr(buffer, "read"):
+        raise ValueError("Unsupported upload payload; expected bytes-like object.")
+    elif hasattr(buffer, "seek"):
+        buffer.seek(0)
+
+    series = read_series_csv(buffer)
+    if not len(series):
         raise ValueError("No valid rows detected in the uploaded CSV.")
-    return points
+    return series
+
+
+def future_month_dates(last_date: np.datetime64, horizon: int) -> np.ndarray:
+    """Vectorised add_months: the ``horizon`` monthly dates following ``last_date``."""
+
+    last_date = np.datetime64(last_date, "D")
+    anchor_month = last_date.astype("datetime64[M]")
+    months = anchor_month + np.arange(1, horizon + 1)
+    month_starts = months.astype("datetime64[D]")
+    month_lengths = (months + 1).astype("datetime64[D]") - month_starts
+    day_offset = last_date - anchor_month.astype("datetime64[D]")
+    return month_starts + np.minimum(day_offset, month_lengths - 1)
+
+
+@st.cache_data(show_spinner=False)
+def _demo_cached(length: int) -> SeriesFrame:
+    return as_array_frame(generate_demo_series(length=length))
 
 
-def make_history_frame(points: Sequence[SeriesPoint], smoothed: Sequence[Optional[float]]) -> pd.DataFrame:
-    lookback = len(points)
-    history_ma = smoothed[-lookback:]
+@st.cache_data(show_spinner=False)
+def _load_csv_cached(path_str: str, mtime: float) -> SeriesFrame:
+    # mtime is part of the cache key so edits to the file invalidate it.
+    return read_series_csv(Path(path_str))
+
+
+@st.cache_data(show_spinner=False)
+def _upload_cached(digest: str, _payload: bytes) -> SeriesFrame:
+    # Keyed on the content digest; the leading underscore keeps Streamlit from hashing the payload again.
+    return parse_uploaded_csv(_payload)
+
+
+@st.cache_data(show_spinner=False)
+def _ma_cached(values: np.ndarray, window: int) -> np.ndarray:
+    return moving_average_array(values, window)
+
+
+@st.cache_data(show_spinner=False)
+def _forecast_cached(values: np.ndarray, window: int, horizon: int) -> List[float]:
+    return forecast(values, window, horizon)
+
+
+def make_history_frame(history: SeriesFrame, smoothed: np.ndarray) -> pd.DataFrame:
     return pd.DataFrame(
         {
-            "Date": [p.date for p in points],
-            "Actual": [p.value for p in points],
-            "Moving Average": history_ma,
+            "Date": history.dates,
+            "Actual": history.values,
+            "Moving Average": smoothed[-len(history) :],
         }
     )
 
 
-def make_forecast_frame(dates: Sequence[dt.date], predictions: Sequence[float]) -> pd.DataFrame:
+def make_forecast_frame(dates: np.ndarray, predictions: Sequence[float]) -> pd.DataFrame:
     return pd.DataFrame({"Date": dates, "Prediction": predictions})
 
 
-def make_chart(history_dates: Sequence[dt.date], future_dates: Sequence[dt.date],
-               history_values: Sequence[float], forecasts: Sequence[float]) -> alt.Chart:
-    chart_df = pd.DataFrame(
+def stack_series(history_dates: np.ndarray, future_dates: np.ndarray,
+                 history_values: np.ndarray, forecasts: Sequence[float],
+                 labels: Sequence[str] = ("History", "Forecast")) -> pd.DataFrame:
+    """Long-format frame of history followed by forecast, built from typed arrays."""
+
+    return pd.DataFrame(
         {
-            "date": list(history_dates) + list(future_dates),
-            "value": list(history_values) + list(forecasts),
-            "series": ["History"] * len(history_values) + ["Forecast"] * len(forecasts),
+            "date": np.concatenate(
+                [np.asarray(history_dates, dtype="datetime64[D]"), np.asarray(future_dates, dtype="datetime64[D]")]
+            ),
+            "value": np.concatenate(
+                [np.asarray(history_values, dtype=np.float64), np.asarray(forecasts, dtype=np.float64)]
+            ),
+            "series": np.repeat(np.array(labels, dtype=object), [len(history_values), len(forecasts)]),
         }
     )
+
+
+def make_chart(history_dates: np.ndarray, future_dates: np.ndarray,
+               history_values: np.ndarray, forecasts: Sequence[float]) -> alt.Chart:
+    chart_df = stack_series(history_dates, future_dates, history_values, forecasts)
     return (
         alt.Chart(chart_df)
         .mark_line(point=True)
@@ -105,52 +185,56 @@ def main() -> None:
             uploaded_file = st.file_uploader("CSV with columns date,value", type="csv")
 
     if source == "Synthetic signal":
-        series = generate_demo_series(length=48)
+        series = _demo_cached(48)
     elif source == "Bundled CSV sample":
         if not SAMPLE_CSV.exists():
             st.error("Sample CSV is missing from the data/ directory.")
             st.stop()
-        series = load_series_from_csv(SAMPLE_CSV)
+        series = _load_csv_cached(str(SAMPLE_CSV), SAMPLE_CSV.stat().st_mtime)
+        if not len(series):
+            st.error("No valid rows were found in the sample CSV.")
+            st.stop()
     else:
         if uploaded_file is None:
             st.info("Upload a CSV file to continue.")
             st.stop()
         try:
-            series = parse_uploaded_csv(uploaded_file)
+            payload = uploaded_file.getvalue()
+            series = _upload_cached(hashlib.sha1(payload).hexdigest(), payload)
         except ValueError as exc:
             st.error(str(exc))
             st.stop()
 
-    values = [point.value for point in series]
-    smoothed = moving_average(values, window)
-    forecasts = forecast(values, window, horizon)
-    future_dates = [add_months(series[-1].date, i + 1) for i in range(horizon)]
-    history_points = series[-history_rows:]
+    values = series.values
+    smoothed = _ma_cached(values, window)
+    forecasts = _forecast_cached(values, window, horizon)
+    future_dates = future_month_dates(series.dates[-1], horizon)
+    history = SeriesFrame(dates=series.dates[-history_rows:], values=values[-history_rows:])
 
     col1, col2 = st.columns(2)
-    col1.metric("Last actual", f"{series[-1].value:.2f}", delta=None)
+    col1.metric("Last actual", f"{values[-1]:.2f}", delta=None)
     col2.metric("Next forecast", f"{forecasts[0]:.2f}" if forecasts else "n/a")
 
     st.subheader("Recent history")
-    st.dataframe(make_history_frame(history_points, smoothed), hide_index=True, use_container_width=True)
+    st.dataframe(
+        make_history_frame(history, smoothed),
+        hide_index=True,
+        use_container_width=True,
+        column_config=DATE_COLUMNS,
+    )
 
     st.subheader("Forecast horizon")
     forecast_frame = make_forecast_frame(future_dates, forecasts)
-    st.dataframe(forecast_frame, hide_index=True, use_container_width=True)
+    st.dataframe(forecast_frame, hide_index=True, use_container_width=True, column_config=DATE_COLUMNS)
 
     st.subheader("Chart")
-    chart = make_chart([p.date for p in series], future_dates, values, forecasts)
+    chart = make_chart(series.dates, future_dates, values, forecasts)
     st.altair_chart(chart, use_container_width=True)
 
-    combined = pd.concat(
-        [
-            pd.DataFrame({"date": [p.date for p in series], "value": values, "series": "history"}),
-            pd.DataFrame({"date": future_dates, "value": forecasts, "series": "forecast"}),
-        ],
-        ignore_index=True,
-    )
-    csv_payload = combined.to_csv(index=False).encode("utf-8")
-    st.download_button("Download combined series", data=csv_payload, file_name="moving_average_forecast.csv", mime="text/csv")
+    combined = stack_series(series.dates, future_dates, values, forecasts, labels=("history", "forecast"))
+    csv_buffer = io.BytesIO()
+    combined.to_csv(csv_buffer, index=False, encoding="utf-8", chunksize=CSV_CHUNK_ROWS)
+    st.download_button("Download combined series", data=csv_buffer.getvalue(), file_name="moving_average_forecast.csv", mime="text/csv")
 
 
 if __name__ == "__main__":